@@ -1,5 +1,5 @@
 from fastapi import Header, HTTPException, Depends
-from sqlmodel import Session
+from sqlmodel import Session, select
 from models import User # Assuming models.py is in the same directory
 from database import get_session
 
@@ -20,9 +20,14 @@ async def get_current_user(
             detail="User ID must be provided in the 'X-User-Id' header."
         )
 
-    user = session.get(User, x_user_id)
-    if not user:
+    # Only the primary key is selected, so the lookup is served from the index
+    # without loading (and deserializing) the rest of the user row.
+    existing_user_id = session.exec(
+        select(User.user_id).where(User.user_id == x_user_id)
+    ).first()
+    if existing_user_id is None:
         raise HTTPException(status_code=404, detail=f"User with ID {x_user_id} not found.")
-    
-    return user
+
+    # Handlers only need the ID, so return a lightweight, unattached User.
+    return User(user_id=existing_user_id)
 
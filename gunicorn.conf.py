@@ -0,0 +1,31 @@
+# Gunicorn configuration for running the API in production:
+#   gunicorn main:app -c gunicorn.conf.py
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Each worker is a Uvicorn process. Uvicorn's default "auto" loop and http
+# settings pick uvloop and httptools, which are installed by uvicorn[standard].
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Every worker has its own connection pool, so split a total connection budget
+# (DB_MAX_CONNECTIONS, default 140 to stay under MySQL's default
+# max_connections of 151) across the workers. Explicit DB_POOL_SIZE and
+# DB_POOL_OVERFLOW settings take precedence; workers inherit this environment.
+_connections_per_worker = max(int(os.getenv("DB_MAX_CONNECTIONS", "140")) // workers, 2)
+os.environ.setdefault("DB_POOL_SIZE", str(_connections_per_worker // 2))
+os.environ.setdefault("DB_POOL_OVERFLOW", str(_connections_per_worker - _connections_per_worker // 2))
+
+# Keep the worker heartbeat file in memory so a slow disk can't stall it.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set, metrics are aggregated across workers
+    # from files in that directory; drop the live gauges of exited workers.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
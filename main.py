@@ -1,19 +1,30 @@
+import asyncio
 import os
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel, Field
+import re
+import time
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from typing import List
 from datetime import date
 from contextlib import asynccontextmanager
 
 # --- Database and Model Imports ---
-from database import get_session, create_db_and_tables
+from database import engine, get_session, create_db_and_tables
 from models import User, JournalEntry, EntryStatus
 from auth import get_current_user
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+# --- Metrics Imports ---
+from prometheus_client import Histogram
+from prometheus_fastapi_instrumentator import Instrumentator
 
 # --- LangChain Imports ---
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import RedisCache, SQLiteCache
 from langchain.output_parsers import PydanticOutputParser
 
 # --- Load Environment Variables ---
@@ -25,6 +36,21 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment variables. Please set it in your .env file.")
 
+# Matches one whitespace-delimited word; used to count words without
+# materializing the list that str.split() would build.
+_WORD_RE = re.compile(r"\S+")
+
+def count_words(text: str) -> int:
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+# Seconds allowed for each startup warmup step. Keep the total well under
+# Gunicorn's worker timeout (30s by default).
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "10"))
+
+def warm_up_database():
+    with Session(engine) as session:
+        session.exec(select(1))
+
 # --- NEW: Modern Lifespan Event Handler ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,6 +58,29 @@ async def lifespan(app: FastAPI):
     print("Lifespan startup: Creating database and tables...")
     create_db_and_tables()
     print("Lifespan startup: Database is ready.")
+
+    # Warm the connection pool and the Gemini client so the first real request
+    # doesn't pay for connection setup. Each warmup is bounded by its own
+    # timeout and may fail without affecting the other or blocking startup.
+    warmup_start = time.perf_counter()
+    try:
+        await asyncio.wait_for(run_in_threadpool(warm_up_database), timeout=WARMUP_TIMEOUT)
+        print(f"Lifespan startup: Database warmup finished in {time.perf_counter() - warmup_start:.2f}s.")
+    except Exception as e:
+        print(f"Lifespan startup: Database warmup failed, continuing anyway: {e!r}")
+
+    # Disable caching for the ping so it always reaches Gemini and leaves no
+    # entry behind. No requests are served yet, so toggling it here is safe.
+    cache_setting = llm.cache
+    llm.cache = False
+    warmup_start = time.perf_counter()
+    try:
+        await asyncio.wait_for(llm.ainvoke("ping"), timeout=WARMUP_TIMEOUT)
+        print(f"Lifespan startup: LLM warmup finished in {time.perf_counter() - warmup_start:.2f}s.")
+    except Exception as e:
+        print(f"Lifespan startup: LLM warmup failed, continuing anyway: {e!r}")
+    finally:
+        llm.cache = cache_setting
     yield
     # Code here would run on shutdown
     print("Lifespan shutdown.")
@@ -40,10 +89,41 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="Simplified AI Journal API",
     description="Analyzes journal entries and saves to a database.",
+    default_response_class=ORJSONResponse, # orjson serializes responses faster than the stdlib json
     lifespan=lifespan # Use the new lifespan manager
 )
 
+# --- Metrics ---
+# Request-level metrics plus a /metrics endpoint for Prometheus to scrape.
+Instrumentator().instrument(app).expose(app)
+
+# Per-phase timings, labelled by endpoint, to show where request time goes.
+LLM_SECONDS = Histogram("llm_seconds", "Time spent waiting on the Gemini API.", ["endpoint"])
+DB_COMMIT_SECONDS = Histogram("db_commit_seconds", "Time spent saving journal entries.", ["endpoint"])
+
+# --- LLM Response Cache ---
+# Off unless configured. Both backends are exact-match: only a prompt identical
+# to an earlier one (i.e. the same journal text) is answered from the cache.
+# With REDIS_URL set, Redis is used (LLM_CACHE_TTL expires entries, in seconds);
+# with LLM_CACHE_PATH set, a SQLite file is used, for local development only.
+# Cached prompts contain journal text in plaintext. LangChain consults the
+# cache on every llm call, so the handlers need no changes.
+REDIS_URL = os.getenv("REDIS_URL")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH")
+LLM_CACHE_TTL = os.getenv("LLM_CACHE_TTL")
+if REDIS_URL:
+    from redis import Redis
+    set_llm_cache(RedisCache(
+        redis_=Redis.from_url(REDIS_URL),
+        ttl=int(LLM_CACHE_TTL) if LLM_CACHE_TTL else None,
+    ))
+elif LLM_CACHE_PATH:
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 # --- Pass the API key to the model ---
+# Keep this a single module-level instance: it lazily creates one gRPC client
+# (HTTP/2) per process and reuses it, so concurrent ainvoke/abatch/astream
+# calls are multiplexed over already-open connections.
 llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash-latest", google_api_key=GEMINI_API_KEY, temperature=0.7)
 
 
@@ -62,9 +142,18 @@ class SimplifiedAnalysis(BaseModel):
 
 # 2. Define the Pydantic model for the incoming request data.
 class EntryCreateRequest(BaseModel):
-    text: str
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    text: str = Field(min_length=1, max_length=20000)
     entry_status: EntryStatus = EntryStatus.PUBLISHED
 
+# 2b. Define the Pydantic model for submitting several entries at once.
+# Upper bound on entries per batch request; each entry is a separate Gemini call.
+BATCH_MAX_ENTRIES = int(os.getenv("BATCH_MAX_ENTRIES", "20"))
+
+class BatchRequest(BaseModel):
+    entries: List[EntryCreateRequest] = Field(min_length=1, max_length=BATCH_MAX_ENTRIES)
+
 # 3. Create the Output Parser for our new simplified blueprint.
 parser = PydanticOutputParser(pydantic_object=SimplifiedAnalysis)
 
@@ -77,14 +166,32 @@ Follow the instructions and format your response to match the format instruction
 JOURNAL ENTRY:
 {entry}
 """
-prompt = PromptTemplate(
-    template=prompt_template_str,
-    input_variables=["entry"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
-)
+# The format instructions never change, so render everything except the entry
+# once at import time; each request only has to splice in its own text.
+FORMAT_INSTRUCTIONS = parser.get_format_instructions()
+PROMPT_PREFIX = prompt_template_str.format(format_instructions=FORMAT_INSTRUCTIONS, entry="{entry}")
+
+def build_prompt(entry_text: str) -> str:
+    # A single str.replace leaves any braces in the user's text untouched.
+    return PROMPT_PREFIX.replace("{entry}", entry_text)
+
+def parse_analysis(content: str) -> SimplifiedAnalysis:
+    """
+    Parses the model's reply straight into SimplifiedAnalysis with Pydantic's
+    JSON validator, falling back to the LangChain parser (which can locate
+    JSON embedded in surrounding prose) if the reply isn't bare JSON.
+    """
+    raw_json = content.strip().removeprefix("```json").removesuffix("```").strip()
+    try:
+        return SimplifiedAnalysis.model_validate_json(raw_json)
+    except ValidationError:
+        return parser.parse(content)
+
+# Upper bound on concurrent Gemini calls made by the batch endpoint.
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
 
 @app.post("/analyze-entry", response_model=SimplifiedAnalysis)
-def analyze_and_save_entry(
+async def analyze_and_save_entry(
     entry_data: EntryCreateRequest,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
@@ -93,37 +200,146 @@ def analyze_and_save_entry(
     Analyzes a journal entry for sentiment and advice, saves the entry to the
     database for the current user, and returns the AI's analysis.
     """
-    if not entry_data.text:
-        raise HTTPException(status_code=400, detail="Entry text cannot be empty.")
-
-    final_prompt = prompt.invoke({"entry": entry_data.text})
+    final_prompt = build_prompt(entry_data.text)
     try:
-        output = llm.invoke(final_prompt)
-        analysis_result = parser.parse(output.content)
+        with LLM_SECONDS.labels("/analyze-entry").time():
+            output = await llm.ainvoke(final_prompt)
+        analysis_result = parse_analysis(output.content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get a structured response from the AI: {e}")
 
-    try:
-        db_journal_entry = JournalEntry(
-            user_id=current_user.user_id,
-            entry_date=date.today(),
-            text=entry_data.text,
-            sentiment_score=analysis_result.sentimentScore,
-            entry_status=entry_data.entry_status,
-            word_count=len(entry_data.text.split()),
-            ai_suggestion={"counsel": analysis_result.counsel} 
-        )
-        
-        session.add(db_journal_entry)
-        session.commit()
-        session.refresh(db_journal_entry)
-        
-    except Exception as db_e:
-        session.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to save the entry to the database: {db_e}")
+    # The SQLModel session is synchronous, so run the write in a worker thread
+    # to keep the event loop free while the commit is in flight.
+    def save_entry():
+        try:
+            db_journal_entry = JournalEntry(
+                user_id=current_user.user_id,
+                entry_date=date.today(),
+                text=entry_data.text,
+                sentiment_score=analysis_result.sentimentScore,
+                entry_status=entry_data.entry_status,
+                word_count=count_words(entry_data.text),
+                ai_suggestion={"counsel": analysis_result.counsel} 
+            )
+
+            with DB_COMMIT_SECONDS.labels("/analyze-entry").time():
+                session.add(db_journal_entry)
+                session.commit()
+
+        except Exception as db_e:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to save the entry to the database: {db_e}")
+
+    await run_in_threadpool(save_entry)
 
     return analysis_result
 
+@app.post("/analyze-entries", response_model=List[SimplifiedAnalysis])
+async def analyze_and_save_entries(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Analyzes several journal entries concurrently, saves them all to the
+    database in a single commit, and returns the analyses in request order.
+    The batch succeeds or fails as a whole: if any AI call or parse fails,
+    nothing is saved and the request returns 500.
+    """
+    prompts = [build_prompt(entry.text) for entry in batch.entries]
+    try:
+        with LLM_SECONDS.labels("/analyze-entries").time():
+            outputs = await llm.abatch(prompts, config={"max_concurrency": BATCH_MAX_CONCURRENCY})
+        analysis_results = [parse_analysis(output.content) for output in outputs]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get a structured response from the AI: {e}")
+
+    def save_entries():
+        try:
+            db_journal_entries = [
+                JournalEntry(
+                    user_id=current_user.user_id,
+                    entry_date=date.today(),
+                    text=entry.text,
+                    sentiment_score=analysis.sentimentScore,
+                    entry_status=entry.entry_status,
+                    word_count=count_words(entry.text),
+                    ai_suggestion={"counsel": analysis.counsel}
+                )
+                for entry, analysis in zip(batch.entries, analysis_results)
+            ]
+
+            with DB_COMMIT_SECONDS.labels("/analyze-entries").time():
+                session.add_all(db_journal_entries)
+                session.commit()
+
+        except Exception as db_e:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to save the entries to the database: {db_e}")
+
+    await run_in_threadpool(save_entries)
+
+    return analysis_results
+
+@app.post("/analyze-entry/stream")
+async def analyze_and_save_entry_stream(
+    entry_data: EntryCreateRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streams the AI's reply as newline-delimited JSON while it is generated:
+    one {"token": ...} frame per chunk, then a final {"analysis": ...} frame
+    (or {"error": ...} if the reply can't be parsed). The entry is saved to
+    the database in a background task once the stream has finished.
+    """
+    final_prompt = build_prompt(entry_data.text)
+    user_id = current_user.user_id
+
+    # Runs after the response has been sent, when the request's own session
+    # is already closed, so it opens a session of its own.
+    def save_entry(analysis_result: SimplifiedAnalysis):
+        with Session(engine) as session:
+            try:
+                db_journal_entry = JournalEntry(
+                    user_id=user_id,
+                    entry_date=date.today(),
+                    text=entry_data.text,
+                    sentiment_score=analysis_result.sentimentScore,
+                    entry_status=entry_data.entry_status,
+                    word_count=count_words(entry_data.text),
+                    ai_suggestion={"counsel": analysis_result.counsel}
+                )
+
+                with DB_COMMIT_SECONDS.labels("/analyze-entry/stream").time():
+                    session.add(db_journal_entry)
+                    session.commit()
+
+            except Exception as db_e:
+                session.rollback()
+                print(f"Failed to save the streamed entry to the database: {db_e}")
+
+    async def stream_analysis():
+        chunks = []
+        try:
+            # Observed only once the stream completes; this includes time the
+            # client takes to read each frame.
+            llm_start = time.perf_counter()
+            async for chunk in llm.astream(final_prompt):
+                chunks.append(chunk.content)
+                yield orjson.dumps({"token": chunk.content}) + b"\n"
+            LLM_SECONDS.labels("/analyze-entry/stream").observe(time.perf_counter() - llm_start)
+            analysis_result = parse_analysis("".join(chunks))
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band.
+            yield orjson.dumps({"error": f"Failed to get a structured response from the AI: {e}"}) + b"\n"
+            return
+
+        yield orjson.dumps({"analysis": analysis_result.model_dump()}) + b"\n"
+        background_tasks.add_task(save_entry, analysis_result)
+
+    return StreamingResponse(stream_analysis(), media_type="application/x-ndjson")
+
 @app.get("/")
 def read_root():
     return {"status": "Simplified AI Journal API is running"}
@@ -4,11 +4,17 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy import JSON, BigInteger, Column, Date, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer, SmallInteger, String, Text
+from sqlalchemy import ForeignKey, Index, Integer, SmallInteger, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlmodel import Field, Relationship, SQLModel
 from sqlalchemy import Boolean, Column
 
+# JSON document column: binary JSONB on PostgreSQL, the native JSON type
+# elsewhere (MySQL already stores JSON in a parsed binary format).
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
 class EntryStatus(str, Enum):
     """Enumeration for state of journal entry."""
 
@@ -61,7 +67,7 @@ class User(SQLModel, table=True):
     )
     password_hash: str = Field(sa_column=Column(String(255), nullable=False))
     background_info: Optional[Dict[str, Any]] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
+        default=None, sa_column=Column(JSONDocument, nullable=True)
     )
     role: int = Field(
         default=UserRole.USER.value,
@@ -71,16 +77,16 @@ class User(SQLModel, table=True):
         default=None, sa_column=Column(String(500), nullable=True)
     )
     preferences: Optional[Dict[str, Any]] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
+        default=None, sa_column=Column(JSONDocument, nullable=True)
     )
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,  # For Pydantic model
+    created_at: Optional[datetime] = Field(
+        default=None,  # Generated by the database via server_default
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), nullable=False
         ),
     )
-    updated_at: datetime = Field(
-        default_factory=datetime.utcnow,  # For Pydantic model
+    updated_at: Optional[datetime] = Field(
+        default=None,  # Generated by the database via server_default
         sa_column=Column(
             DateTime(timezone=True),
             server_default=func.now(),
@@ -126,8 +132,8 @@ class Session(SQLModel, table=True):
     token: str = Field(
         sa_column=Column(String(512), unique=True, index=True, nullable=False)
     )
-    issued_at: datetime = Field(
-        default_factory=datetime.utcnow,
+    issued_at: Optional[datetime] = Field(
+        default=None,
         sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False),
     )
     expires_at: datetime = Field(
@@ -201,8 +207,8 @@ class UserBadge(SQLModel, table=True):
             index=True,
         )
     )
-    earned_at: datetime = Field(
-        default_factory=datetime.utcnow,
+    earned_at: Optional[datetime] = Field(
+        default=None,
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), nullable=False
         ),
@@ -255,6 +261,8 @@ class JournalEntry(SQLModel, table=True):
     """Journal entry model representing user's daily journal entries."""
 
     __tablename__ = "journal_entry"
+    # Serves "a user's entries ordered by date" with a single index range scan.
+    __table_args__ = (Index("ix_journal_entry_user_date", "user_id", "entry_date"),)
 
     journal_entry_id: Optional[int] = Field(
         default=None,
@@ -265,19 +273,18 @@ class JournalEntry(SQLModel, table=True):
             BigInteger,
             ForeignKey("user.user_id", ondelete="CASCADE"),
             nullable=False,
-            index=True,
-        )
+        )  # Indexed by ix_journal_entry_user_date
     )
-    entry_date: date = Field(sa_column=Column(Date, nullable=False, index=True))
+    entry_date: date = Field(sa_column=Column(Date, nullable=False))
     text: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
     sentiment_score: Optional[int] = Field(
         default=None, sa_column=Column(SmallInteger, nullable=True)
     )
     ai_suggestion: Optional[Dict[str, Any]] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
+        default=None, sa_column=Column(JSONDocument, nullable=True)
     )
     chat_log: Optional[Dict[str, Any]] = Field(
-        default=None, sa_column=Column(JSON, nullable=True)
+        default=None, sa_column=Column(JSONDocument, nullable=True)
     )
     entry_status: Optional[EntryStatus] = Field(
         default=None, sa_column=Column(SQLEnum(EntryStatus), nullable=True)
@@ -285,14 +292,14 @@ class JournalEntry(SQLModel, table=True):
     word_count: int = Field(
         default=0, sa_column=Column(Integer, default=0, nullable=False)
     )
-    created_at: datetime = Field(
-        default_factory=datetime.utcnow,
+    created_at: Optional[datetime] = Field(
+        default=None,
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), nullable=False
         ),
     )
-    updated_at: datetime = Field(
-        default_factory=datetime.utcnow,
+    updated_at: Optional[datetime] = Field(
+        default=None,
         sa_column=Column(
             DateTime(timezone=True),
             server_default=func.now(),